@@ -0,0 +1,41 @@
+"""Export the CRNN recognizer to ONNX and write an INT8 dynamically quantized copy.
+
+Run from the Backend directory:  python export_onnx.py
+Needs the `onnx` and `onnxruntime` packages. The server picks up the exported models
+(CRNN_ONNX_FP32_PATH / CRNN_ONNX_PATH in src/config.py) automatically on the next start.
+"""
+
+import os
+import torch
+from onnxruntime.quantization import quantize_dynamic, QuantType
+
+from src.config import CRNN_PATH, CRNN_ONNX_PATH, CRNN_ONNX_FP32_PATH, IMG_H, IMG_W
+from src.architecture import CustomCRNN, load_crnn_state_dict
+from src.logger import Log
+
+def export(fp32_path, int8_path):
+    """Trace the CRNN to ONNX with a dynamic batch axis, then quantize its weights to INT8."""
+
+    state_dict = load_crnn_state_dict(CRNN_PATH, "cpu")
+    # The final projection's output size is the vocabulary size the model was trained with.
+    num_classes = state_dict["rnn.4.weight"].shape[0]
+    model = CustomCRNN(num_classes)
+    model.load_state_dict(state_dict)
+    model.eval()
+
+    Log.process(f"Exporting CRNN to {os.path.basename(fp32_path)}...")
+    dummy = torch.zeros(1, 1, IMG_H, IMG_W)
+    torch.onnx.export(
+        model, dummy, fp32_path,
+        input_names=["image"], output_names=["logits"],
+        dynamic_axes={"image": {0: "batch"}, "logits": {0: "batch"}},
+        opset_version=17
+    )
+
+    # LSTM and Linear weights dominate the model size, and dynamic quantization keeps activations in float.
+    Log.process(f"Quantizing to {os.path.basename(int8_path)}...")
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    Log.success("CRNN export finished")
+
+if __name__ == "__main__":
+    export(CRNN_ONNX_FP32_PATH, CRNN_ONNX_PATH)
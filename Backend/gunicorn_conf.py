@@ -0,0 +1,27 @@
+"""Gunicorn settings for running the API with Uvicorn worker processes."""
+
+import os
+
+# Listen on the platform-provided port, falling back to the Hugging Face Spaces default.
+bind = f"0.0.0.0:{os.getenv('PORT', '7860')}"
+
+# Every worker is a full copy of the service: YOLO, the CRNN, the post-processor, their thread
+# pools and, on GPU, its own CUDA context. OCR_CONCURRENCY and the /predict and /translate
+# micro-batching are also per worker, so extra workers split batches rather than grow them.
+# One worker is the default; raise WEB_CONCURRENCY only when RAM/VRAM holds that many copies
+# of the models, and lower OCR_CONCURRENCY and DECODER_WORKERS to match.
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+# Per-request access lines are noise at this volume; server.py logs slow and failed requests itself.
+accesslog = None
+
+# Workers load and warm up the models (torch.compile, a first TensorRT engine build) before
+# they report in, which can take several minutes; a timeout shorter than that makes gunicorn
+# kill and restart them in a loop. The same limit also covers OCR on a large page on CPU.
+timeout = int(os.getenv("WORKER_TIMEOUT", "600"))
+# The frontend makes several calls per scan (corners, predict, TTS, PDF), so keep connections open longer.
+keepalive = 30
+
+# Note: when several workers share one GPU, run the NVIDIA CUDA MPS daemon
+# (nvidia-cuda-mps-control -d) so their kernels can share the device instead of
+# time-slicing, and lower OCR_CONCURRENCY so the combined batches fit in VRAM.
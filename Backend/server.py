@@ -2,24 +2,58 @@
 
 import os
 import io
+import asyncio
+import time
+import hashlib
+import mmap
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import numpy as np
 import cv2
-import uuid
-import shutil
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException, BackgroundTasks
+from PIL import Image
+import msgspec
+import orjson
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, BackgroundTasks, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+from starlette.formparsers import MultiPartParser
 
 # --- Configuration & Security ---
 # File uploads are capped so the server does not keep unbounded image payloads in memory.
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB limit
+# Whole request bodies may be slightly larger to leave room for multipart framing and form fields.
+MAX_REQUEST_BODY = MAX_FILE_SIZE + 1024 * 1024
 ALLOWED_IMAGE_TYPES = ["image/jpeg", "image/png", "image/bmp", "image/webp"]
-TEMP_UPLOAD_DIR = "temp"
+# Uploads larger than this are spooled to a temp file by Starlette, which read_upload maps instead of copying.
+UPLOAD_SPOOL_SIZE = getattr(MultiPartParser, "spool_max_size", 1024 * 1024)
+
+# EXIF tag holding the camera orientation, and OpenCV's reduced-size decode modes (largest first).
+EXIF_ORIENTATION_TAG = 0x0112
+REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
 
-# Ensure the upload directory exists before any request handler tries to write into it.
-if not os.path.exists(TEMP_UPLOAD_DIR):
-    os.makedirs(TEMP_UPLOAD_DIR, mode=0o700) # Only owner can read/write
+# Concurrent /predict calls are coalesced into one batched pass through the OCR engine.
+OCR_BATCH_MAX = int(os.getenv("OCR_BATCH_MAX", "8"))            # Max images per batch
+OCR_BATCH_WAIT_MS = float(os.getenv("OCR_BATCH_WAIT_MS", "30"))  # How long to wait for more requests
+# OCR model work gets its own small executor so concurrent batches do not fight over the GPU
+# and Starlette's shared threadpool stays free for PDF, TTS, and decoding.
+OCR_THREADS = int(os.getenv("OCR_THREADS", "1"))
+ocr_executor = ThreadPoolExecutor(max_workers=OCR_THREADS, thread_name_prefix="ocr")
+# Batches allowed in flight per worker process, one batcher each. More batchers than OCR threads
+# only split the queue into smaller batches that then wait for a thread, so it follows OCR_THREADS.
+# This is an asyncio semaphore, so it does not limit OCR across gunicorn workers: the total on
+# the device is OCR_CONCURRENCY x WEB_CONCURRENCY.
+OCR_CONCURRENCY = int(os.getenv("OCR_CONCURRENCY", str(OCR_THREADS)))
+
+# Total MP3 bytes of synthesized TTS clips kept in memory per worker.
+TTS_CACHE_BYTES = int(os.getenv("TTS_CACHE_BYTES", str(64 * 1024 * 1024)))
 
 # --- PDF Generation Imports ---
 from reportlab.lib.pagesizes import letter
@@ -27,23 +61,62 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
 
 # --- TTS Import ---
+import requests
+import gtts.tts
 from gtts import gTTS
+from requests.adapters import HTTPAdapter
+
+class SharedSession(requests.Session):
+    """Session that stays open when used as a context manager, so pooled connections survive."""
+
+    def __exit__(self, *args):
+        pass
+
+class PooledRequests:
+    """Stand-in for the `requests` module inside gTTS that hands out one shared session."""
+
+    def __init__(self, session):
+        self._session = session
+
+    def Session(self):
+        return self._session
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+# gTTS opens a fresh requests.Session (and TLS handshake) for every call; reuse one pool instead.
+tts_session = SharedSession()
+tts_session.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=20))
+gtts.tts.requests = PooledRequests(tts_session)
 
 # --- Imports from the internal OCR pipeline ---
 from src.logger import Log
-from src.ocr_engine import MalayalamOCR
-from src.config import TEMP_DIR, DEBUG_MODE
-from src.preprocessor import get_document_corners
+from src.ocr_engine import get_engine
+from src.config import DEBUG_MODE
+from src.preprocessor import get_document_corners, apply_exif_orientation, DEFAULT_CORNERS
 
 # 1. Initialize the App
 # Swagger/ReDoc are disabled outside debug mode to reduce public exposure.
+# Responses are encoded with orjson, which is much faster than the stdlib json module.
 app = FastAPI(
     title="Malayalam OCR API", 
     description="Production Ready OCR Backend",
     docs_url="/docs" if DEBUG_MODE else None,
-    redoc_url="/redoc" if DEBUG_MODE else None
+    redoc_url="/redoc" if DEBUG_MODE else None,
+    default_response_class=ORJSONResponse
 )
 
+# Starlette wraps later middleware around earlier ones, so this is registered before CORS:
+# the 413 then still gets CORS headers and the browser frontend can read its error message.
+@app.middleware("http")
+async def reject_oversized_bodies(request, call_next):
+    """Refuse requests whose declared Content-Length is over the limit before any body is read."""
+
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > MAX_REQUEST_BODY:
+        return ORJSONResponse(status_code=413, content={"error": "File too large (Max 10MB)"})
+    return await call_next(request)
+
 # 2. CORS Setup (Allow Frontend Access)
 # In production, specific origins should be defined via environment variables.
 env_origins = os.getenv("ALLOWED_ORIGINS", "*")
@@ -66,28 +139,79 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class JSONGZipMiddleware:
+    """GZip the JSON routes only; the PDF and MP3 bodies are already compressed."""
+
+    SKIP_PATHS = {"/generate-pdf", "/tts"}
+
+    def __init__(self, app, minimum_size=512):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope.get("path") in self.SKIP_PATHS:
+            await self.app(scope, receive, send)
+        else:
+            await self.gzip(scope, receive, send)
+
+# OCR/translation JSON is mostly Malayalam UTF-8 text, which compresses well.
+app.add_middleware(JSONGZipMiddleware, minimum_size=512)
+
+# Access logging is off; only failed or slow requests are reported. OCR takes seconds per page
+# on CPU, so the OCR routes get their own, much higher threshold.
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "2000"))
+SLOW_OCR_REQUEST_MS = float(os.getenv("SLOW_OCR_REQUEST_MS", "30000"))
+OCR_PATHS = {"/predict"}
+
+@app.middleware("http")
+async def log_slow_or_failed_requests(request, call_next):
+    """Log requests that return an error status or take longer than their route's slow threshold."""
+
+    start = time.perf_counter()
+    response = await call_next(request)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    slow_ms = SLOW_OCR_REQUEST_MS if request.url.path in OCR_PATHS else SLOW_REQUEST_MS
+    if response.status_code >= 400 or elapsed_ms > slow_ms:
+        Log.warn(f"{request.method} {request.url.path} -> {response.status_code} in {elapsed_ms:.0f} ms")
+    return response
+
 # --- Data Models ---
-class TranslationRequest(BaseModel):
+class TranslationRequest(msgspec.Struct):
     """Request payload for the text-only translation endpoint."""
 
     text: str
 
-class PDFRequest(BaseModel):
+class PDFRequest(msgspec.Struct):
     """Request payload for PDF generation."""
 
     text: str
 
-class TTSRequest(BaseModel):
+class TTSRequest(msgspec.Struct):
     """Request payload for text-to-speech generation."""
 
     text: str
     lang: str  # 'en' for English, 'ml' for Malayalam
 
+def json_body(model):
+    """Build a dependency that decodes the raw JSON body straight into a msgspec struct."""
+
+    # msgspec validates while parsing in C, which is far cheaper than a Pydantic round trip.
+    decoder = msgspec.json.Decoder(model)
+
+    async def parse(request: Request):
+        try:
+            return decoder.decode(await request.body())
+        except msgspec.DecodeError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    return parse
+
 # 3. Load Model on Startup
 ocr_engine = None
+ocr_queue = None
+ocr_semaphore = None
 
 @app.on_event("startup")
-def load_model():
+async def load_model():
     """Load the OCR pipeline once when the API process starts."""
 
     global ocr_engine
@@ -96,51 +220,184 @@ def load_model():
     Log.process("Loading AI Models (YOLO + CRNN + KenLM + NLLB)")
     
     try:
-        # Initializes the robust MalayalamOCR class from src/ocr_engine.py
-        ocr_engine = MalayalamOCR()
+        # Shared, already warmed-up MalayalamOCR instance from src/ocr_engine.py. It is built on
+        # the OCR thread that serves requests, so the per-thread CUDA staging buffers, stream and
+        # compiled CUDA graphs from the warm-up are the ones requests reuse.
+        ocr_engine = await asyncio.get_running_loop().run_in_executor(ocr_executor, get_engine)
         Log.success("Models Loaded Successfully!")
-        print("="*50 + "\n")
     except Exception as e:
         Log.error(f"CRITICAL ERROR : Could not load model.\n{e}")
+        return
+    print("="*50 + "\n")
+
+async def collect_batch(queue, max_size, wait_ms):
+    """Wait for one job, then keep collecting until the batch is full or the window closes."""
+
+    loop = asyncio.get_running_loop()
+    jobs = [await queue.get()]
+    deadline = loop.time() + wait_ms / 1000.0
+    while len(jobs) < max_size:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            jobs.append(await asyncio.wait_for(queue.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+    return jobs
+
+def resolve_jobs(futures, results=None, error=None):
+    """Hand each waiting request its result, or the batch's error."""
+
+    for i, future in enumerate(futures):
+        if future.done():
+            continue
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(results[i])
+
+async def ocr_batch_worker():
+    """Drain queued OCR jobs and run each group through the engine as one batch."""
+
+    loop = asyncio.get_running_loop()
+    while True:
+        jobs = await collect_batch(ocr_queue, OCR_BATCH_MAX, OCR_BATCH_WAIT_MS)
+        futures = [future for _, _, future in jobs]
+
+        images = [image for image, _, _ in jobs]
+        crop_points_list = [crop_points for _, crop_points, _ in jobs]
+        try:
+            async with ocr_semaphore:
+                results = await loop.run_in_executor(
+                    ocr_executor, partial(ocr_engine.run_batch, images, crop_points_list, debug=DEBUG_MODE)
+                )
+        except Exception as e:
+            resolve_jobs(futures, error=e)
+            continue
+        resolve_jobs(futures, results)
+
+@app.on_event("startup")
+async def start_batch_worker():
+    """Start the background tasks that batch /predict requests."""
+
+    global ocr_queue, ocr_semaphore
+    ocr_queue = asyncio.Queue()
+    ocr_semaphore = asyncio.Semaphore(OCR_CONCURRENCY)
+    # One batcher per allowed in-flight batch, so a new batch can form while another is running.
+    app.state.ocr_workers = [asyncio.create_task(ocr_batch_worker()) for _ in range(OCR_CONCURRENCY)]
+
+def decode_image_buffer(contents, min_side=None):
+    """
+    Decode an encoded image buffer into a BGR image, applying EXIF rotation when present.
+    When min_side is given, JPEGs are decoded directly at a reduced scale that keeps
+    the shorter side at least that long, so libjpeg does the downscale during decoding.
+    """
+
+    # Only the header is parsed here (size and EXIF orientation); no pixels are decoded.
+    orientation, flags = 1, cv2.IMREAD_COLOR
+    try:
+        header = Image.open(contents if isinstance(contents, mmap.mmap) else io.BytesIO(contents))
+        orientation = header.getexif().get(EXIF_ORIENTATION_TAG, 1)
+        if min_side:
+            ratio = min(header.size) / min_side
+            for factor, reduced_flag in REDUCED_DECODE_FLAGS:
+                if ratio >= factor:
+                    flags = reduced_flag
+                    break
+    except Exception:
+        pass
+
+    # Decode once with OpenCV and apply the orientation ourselves.
+    nparr = np.frombuffer(contents, np.uint8)
+    try:
+        image = cv2.imdecode(nparr, flags | cv2.IMREAD_IGNORE_ORIENTATION)
+    finally:
+        # Drop the view even on error, or the caller cannot close an mmap-backed upload.
+        del nparr
+    if image is None:
+        return None
+    return apply_exif_orientation(image, orientation)
+
+def decode_upload(contents, min_side=None):
+    """Decode an upload returned by read_upload and release its mmap, if it has one."""
+
+    try:
+        return decode_image_buffer(contents, min_side)
+    finally:
+        if isinstance(contents, mmap.mmap):
+            try:
+                contents.close()
+            except BufferError:
+                # A view is still exported; let the mmap close when collected rather than
+                # hiding the decoding error that is propagating.
+                pass
+
+def parse_crop_points(crop_points):
+    """Parse the optional crop_points form field into a (4, 2) float32 array."""
+
+    if not crop_points:
+        return None
+    return np.asarray(orjson.loads(crop_points), dtype=np.float32).reshape(4, 2)
+
+async def read_upload(file):
+    """
+    Return the upload's contents, or None when it exceeds MAX_FILE_SIZE.
+    Small uploads come back as bytes; uploads Starlette already spooled to disk come
+    back as a read-only mmap of that temp file, so they are never copied into memory.
+    """
+
+    # Starlette already spooled the body and records its size, so oversized files are rejected unread.
+    if file.size is not None and file.size > MAX_FILE_SIZE:
+        return None
+    if file.size is not None and file.size > UPLOAD_SPOOL_SIZE:
+        # Past the spool size the upload lives in a temp file; push any buffered writes
+        # to the OS so the mapping sees the whole file.
+        file.file.flush()
+        contents = mmap.mmap(file.file.fileno(), 0, access=mmap.ACCESS_READ)
+    else:
+        contents = await file.read()
+    if len(contents) > MAX_FILE_SIZE:
+        if isinstance(contents, mmap.mmap):
+            contents.close()
+        return None
+    return contents
 
 # --- New Route: Corner Detection for Auto-Crop ---
+def corners_payload(points, layout):
+    """Serialize a (4, 2) corner array as {"x": [...], "y": [...]} or, for layout=aos, as point pairs."""
+
+    if layout == "aos":
+        return {"points": points.tolist()}
+    return {"x": points[:, 0].tolist(), "y": points[:, 1].tolist()}
+
 @app.post("/detect-corners")
-async def detect_corners_endpoint(file: UploadFile = File(...)):
+async def detect_corners_endpoint(file: UploadFile = File(...), layout: str = "soa"):
     """
-    Returns normalized coordinates [[x,y], [x,y], [x,y], [x,y]]
+    Returns normalized corner coordinates as {"x": [x0..x3], "y": [y0..y3]}
+    (or [[x,y], [x,y], [x,y], [x,y]] with ?layout=aos)
     for the frontend editor to snap to the document.
     """
     try:
            # Reject unsupported formats before doing any expensive image work.
         if file.content_type not in ALLOWED_IMAGE_TYPES:
-             return JSONResponse(status_code=400, content={"error": "Invalid file type."})
+             return ORJSONResponse(status_code=400, content={"error": "Invalid file type."})
 
            # Read the uploaded image once so the same bytes can be reused for decoding.
-        contents = await file.read()
-        if len(contents) > MAX_FILE_SIZE:
-             return JSONResponse(status_code=413, content={"error": "File too large (Max 10MB)"})
-
-           # OpenCV gets the raw bytes first; PIL is used to correct EXIF rotation when present.
-        nparr = np.frombuffer(contents, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-           # Handle EXIF rotation so mobile uploads are detected in the right orientation.
-        try:
-            from PIL import Image, ImageOps
-            pil_image = Image.open(io.BytesIO(contents))
-            pil_image = ImageOps.exif_transpose(pil_image)
-            image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
-        except:
-            pass
+        contents = await read_upload(file)
+        if contents is None:
+             return ORJSONResponse(status_code=413, content={"error": "File too large (Max 10MB)"})
 
+        # Corner detection works on a 600px-high copy, so there is no need to decode at full size.
+        image = await run_in_threadpool(decode_upload, contents, 600)
         points = get_document_corners(image)
         Log.info("Document corners detected.")
-        return {"points": points}
+        return corners_payload(points, layout)
         
     except Exception as e:
         Log.warn(f"Corner detection failed: {e}")
         # Fall back to a centered rectangle if contour detection fails.
-        return {"points": [[0.2, 0.2], [0.8, 0.2], [0.8, 0.8], [0.2, 0.8]]}
+        return corners_payload(DEFAULT_CORNERS, layout)
 
 # 4. Image OCR Route (Updated for Cropping & Lens)
 @app.post("/predict")
@@ -150,39 +407,33 @@ async def predict(
 ):
     """Run OCR on an uploaded image and return raw, corrected, and translated text."""
 
-    temp_file_path = None
     try:
-        # 1. Validate the upload before touching disk.
+        # 1. Validate the upload and crop points before decoding anything.
         if file.content_type not in ALLOWED_IMAGE_TYPES:
-             return JSONResponse(status_code=400, content={"error": "Invalid file type. Only images allowed."})
-        
-        # 2. Save the upload with a random filename so user input cannot control the path.
-        file_ext = file.filename.split('.')[-1] if '.' in file.filename else "jpg"
-        filename_secure = f"{uuid.uuid4()}.{file_ext}"
-        temp_file_path = os.path.join(TEMP_UPLOAD_DIR, filename_secure)
+             return ORJSONResponse(status_code=400, content={"error": "Invalid file type. Only images allowed."})
+
+        try:
+            points = parse_crop_points(crop_points)
+        except (orjson.JSONDecodeError, ValueError, TypeError):
+            return ORJSONResponse(status_code=422, content={"error": "crop_points must be a JSON array of four [x, y] pairs."})
         
-        file_size = 0
-        with open(temp_file_path, "wb") as buffer:
-            while True:
-                # Stream in chunks to avoid loading large uploads into memory at once.
-                chunk = await file.read(1024 * 1024) # 1MB chunks
-                if not chunk:
-                    break
-                file_size += len(chunk)
-                if file_size > MAX_FILE_SIZE:
-                    buffer.close()
-                    os.remove(temp_file_path)
-                    return JSONResponse(status_code=413, content={"error": "File too large (Max 10MB)"})
-                buffer.write(chunk)
-
-        # 3. Run OCR through the shared engine.
+        # 2. Read the upload once and decode it in memory; nothing is written to disk.
+        contents = await read_upload(file)
+        if contents is None:
+            return ORJSONResponse(status_code=413, content={"error": "File too large (Max 10MB)"})
+
+        image = await run_in_threadpool(decode_upload, contents)
+        if image is None:
+            return ORJSONResponse(status_code=400, content={"error": "Could not decode image."})
+
+        # 3. Queue the image for the batch worker, which runs the OCR engine off the event loop.
         try:
-            full_text, corrected, translated = ocr_engine.run(temp_file_path, crop_points=crop_points, debug=DEBUG_MODE)
+            future = asyncio.get_running_loop().create_future()
+            await ocr_queue.put((image, points, future))
+            full_text, corrected, translated = await future
         except Exception as e:
-            import traceback
-            traceback.print_exc()
-            Log.error(f"OCR Engine Failed: {str(e)}")
-            return JSONResponse(status_code=500, content={"error": f"OCR Engine Failed: {str(e)}"})
+            Log.exception(f"OCR Engine Failed: {str(e)}")
+            return ORJSONResponse(status_code=500, content={"error": f"OCR Engine Failed: {str(e)}"})
         
         return {
             "original_text": full_text,
@@ -191,22 +442,12 @@ async def predict(
         }
 
     except Exception as e:
-        import traceback
-        traceback.print_exc()
-        Log.error(f"Prediction Error: {e}")
-        return JSONResponse(status_code=500, content={"error": str(e)})
-        
-    finally:
-        # 4. Remove the temporary upload regardless of success or failure.
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.remove(temp_file_path)
-            except:
-                pass
+        Log.exception(f"Prediction Error: {e}")
+        return ORJSONResponse(status_code=500, content={"error": str(e)})
 
 # 5. Text-Only Translation Route
 @app.post("/translate")
-async def translate_text_only(request: TranslationRequest):
+async def translate_text_only(request: TranslationRequest = Depends(json_body(TranslationRequest))):
     """
     Takes TEXT (Malayalam) -> Returns Corrected Malayalam, English Translation
     Useful for manual testing or chatbot features.
@@ -215,11 +456,11 @@ async def translate_text_only(request: TranslationRequest):
         if not ocr_engine:
             raise Exception("Model is not loaded.")
 
-        # Re-use the post-processor directly so text-only requests follow the same cleanup path.
-        # Note: 'process' returns (corrected, translation).
-        corrected, translation = ocr_engine.post_processor.process(request.text)
+        # Re-use the post-processor so text-only requests follow the same cleanup path. Each text
+        # is its own translation request, so there is nothing to gain from batching callers.
+        corrected, translation = await run_in_threadpool(ocr_engine.post_processor.process, request.text)
 
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "status": "success",
             "original_input": request.text,
             "corrected_text": corrected,
@@ -228,56 +469,120 @@ async def translate_text_only(request: TranslationRequest):
 
     except Exception as e:
         Log.error(f"Translation API Error: {e}")
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "status": "error",
             "message": str(e)
         }, status_code=500)
 
 # 6. PDF Generation Route
-@app.post("/generate-pdf")
-async def generate_pdf_endpoint(request: PDFRequest):
-    """
-    Generates a PDF file from the provided text.
-    """
+# Building the ReportLab sample stylesheet is relatively expensive, so it is done once at import.
+PDF_STYLES = getSampleStyleSheet()
+PDF_TITLE_STYLE = PDF_STYLES['Title']
+PDF_BODY_STYLE = PDF_STYLES['Normal']
+# ReportLab parses paragraph text as markup, so raw OCR output must have these characters escaped.
+PDF_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+PDF_LAYOUT = dict(
+    pagesize=letter,
+    rightMargin=72,
+    leftMargin=72,
+    topMargin=72,
+    bottomMargin=18
+)
+
+def build_pdf(text):
+    """Render the text into an in-memory PDF and return its bytes."""
+
     buffer = io.BytesIO()
     
     # Build the PDF in memory so the endpoint can stream the result back immediately.
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=letter,
-        rightMargin=72,
-        leftMargin=72,
-        topMargin=72,
-        bottomMargin=18
-    )
-
-    # Use the default ReportLab styles for a simple document layout.
-    styles = getSampleStyleSheet()
+    doc = SimpleDocTemplate(buffer, **PDF_LAYOUT)
     story = []
 
     # Add a title block before the translated content.
-    story.append(Paragraph("Translated Document", styles['Title']))
+    story.append(Paragraph("Translated Document", PDF_TITLE_STYLE))
     story.append(Spacer(1, 12))
 
-    # Convert newlines to HTML breaks because ReportLab Paragraph renders basic markup.
-    formatted_text = request.text.replace("\n", "<br />")
-    story.append(Paragraph(formatted_text, styles['Normal']))
+    # Escape markup in one pass, then emit one Paragraph per line; ReportLab lays out many short
+    # paragraphs faster than one large block full of <br/> tags. Blank lines keep their height.
+    escaped_text = text.translate(PDF_ESCAPE_TABLE)
+    for line in escaped_text.split("\n"):
+        story.append(Paragraph(line or "&nbsp;", PDF_BODY_STYLE))
 
     # Finalize the document into the in-memory buffer.
     doc.build(story)
     
-    # Rewind so the response reads from the start of the generated file.
-    buffer.seek(0)
+    # getvalue() hands back the buffer's own bytes object without copying it.
+    return buffer.getvalue()
+
+@app.post("/generate-pdf")
+async def generate_pdf_endpoint(request: PDFRequest = Depends(json_body(PDFRequest))):
+    """
+    Generates a PDF file from the provided text.
+    """
+    # Layout and rendering are CPU-bound, so keep them off the event loop.
+    pdf_bytes = await run_in_threadpool(build_pdf, request.text)
     
-    return StreamingResponse(
-        buffer, 
+    # The whole file is already in memory, so send it in one piece; streaming a BytesIO
+    # would iterate it line by line, which for binary PDF data means many tiny chunks.
+    return Response(
+        pdf_bytes, 
         media_type="application/pdf", 
         headers={"Content-Disposition": "attachment; filename=translation.pdf"}
     )
 
 # 7. Text-to-Speech Route
+class TTSCache:
+    """LRU of synthesized clips keyed by (lang, sha256(text)) and bounded by total MP3 bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.clips = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            audio = self.clips.get(key)
+            if audio is not None:
+                self.clips.move_to_end(key)
+            return audio
+
+    def put(self, key, audio):
+        if len(audio) > self.max_bytes:
+            return
+        with self.lock:
+            old = self.clips.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self.clips[key] = audio
+            self.size += len(audio)
+            while self.size > self.max_bytes:
+                _, evicted = self.clips.popitem(last=False)
+                self.size -= len(evicted)
+
+tts_cache = TTSCache(TTS_CACHE_BYTES)
+
+def synthesize_speech(lang, text):
+    """Fetch MP3 bytes from Google TTS; repeated (lang, text) pairs are served from memory."""
+
+    # Key on a digest so the cache never holds the (unbounded) request texts themselves.
+    key = (lang, hashlib.sha256(text.encode("utf-8")).digest())
+    audio = tts_cache.get(key)
+    if audio is not None:
+        return audio
+
+    # Generate audio at normal reading speed.
+    tts = gTTS(text=text, lang=lang, slow=False)
+
+    # Write the MP3 directly into memory so no temporary file is needed.
+    buffer = io.BytesIO()
+    tts.write_to_fp(buffer)
+    audio = buffer.getvalue()
+    tts_cache.put(key, audio)
+    return audio
+
 @app.post("/tts")
-async def tts_endpoint(request: TTSRequest):
+async def tts_endpoint(request: TTSRequest = Depends(json_body(TTSRequest))):
     """
     Generates MP3 audio from text using Google TTS.
     """
@@ -285,19 +590,13 @@ async def tts_endpoint(request: TTSRequest):
         if not request.text.strip():
             raise Exception("No text provided")
 
-        # Generate audio at normal reading speed.
-        tts = gTTS(text=request.text, lang=request.lang, slow=False)
-        
-        # Write the MP3 directly into memory so no temporary file is needed.
-        buffer = io.BytesIO()
-        tts.write_to_fp(buffer)
-        buffer.seek(0)
-        
-        return StreamingResponse(buffer, media_type="audio/mp3")
+        # The network call to Google is blocking, so it runs on a worker thread.
+        audio = await run_in_threadpool(synthesize_speech, request.lang, request.text)
+        return Response(audio, media_type="audio/mp3")
 
     except Exception as e:
         Log.error(f"TTS Error: {e}")
-        return JSONResponse(status_code=500, content={"error": str(e)})
+        return ORJSONResponse(status_code=500, content={"error": str(e)})
 
 # 8. Health Check
 @app.get("/")
@@ -311,4 +610,15 @@ if __name__ == "__main__":
     import uvicorn
     # Run this file directly for local development.
     port = int(os.environ.get("PORT", 7860))
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    # The frontend makes several calls per scan (corners, predict, TTS, PDF), so keep connections open longer.
+    uvicorn.run(
+        "server:app",
+        host="0.0.0.0",
+        port=port,
+        timeout_keep_alive=30,
+        loop="uvloop",
+        http="httptools",
+        access_log=False,
+        # Same variable gunicorn_conf.py reads, so both runners scale the same way.
+        workers=int(os.getenv("WEB_CONCURRENCY", "1"))
+    )
\ No newline at end of file
@@ -2,6 +2,7 @@
 
 import torch
 import torch.nn as nn
+from torch.nn.utils.fusion import fuse_conv_bn_eval
 
 class ResNetBlock(nn.Module):
     """Residual convolution block used by the feature extractor."""
@@ -29,6 +30,16 @@ class ResNetBlock(nn.Module):
         out = self.relu(out)
         return out
 
+    def fuse_conv_bn(self):
+        """Fold each BatchNorm into the convolution before it (eval mode only)."""
+
+        self.conv1 = fuse_conv_bn_eval(self.conv1, self.bn1)
+        self.bn1 = nn.Identity()
+        self.conv2 = fuse_conv_bn_eval(self.conv2, self.bn2)
+        self.bn2 = nn.Identity()
+        if self.downsample is not None:
+            self.downsample = fuse_conv_bn_eval(self.downsample[0], self.downsample[1])
+
 class CustomCRNN(nn.Module):
     """Residual CNN + BiLSTM recognizer that maps word images to character logits."""
 
@@ -77,6 +88,24 @@ class CustomCRNN(nn.Module):
             layers.append(ResNetBlock(out_channels, out_channels))
         return nn.Sequential(*layers)
 
+    def fuse_conv_bn(self):
+        """
+        Fold every BatchNorm into its preceding convolution for inference.
+        Must be called after loading weights and switching to eval mode; the
+        fused model cannot be trained or reloaded from an unfused checkpoint.
+        """
+
+        self.conv1 = fuse_conv_bn_eval(self.conv1, self.bn1)
+        self.bn1 = nn.Identity()
+        for layer in (self.layer1, self.layer2, self.layer3, self.layer4):
+            for block in layer:
+                block.fuse_conv_bn()
+        self.last_conv = nn.Sequential(
+            fuse_conv_bn_eval(self.last_conv[0], self.last_conv[1]),
+            self.last_conv[2]
+        )
+        return self
+
     def forward(self, x):
         """Convert a batch of word images into a batch of sequence logits."""
 
@@ -85,8 +114,10 @@ class CustomCRNN(nn.Module):
         x = self.layer1(x); x = self.layer2(x); x = self.layer3(x); x = self.layer4(x)
         x = self.last_conv(x)
         
-        # 2. Reformat CNN output into a time series for the recurrent head.
-        x = x.squeeze(2).permute(0, 2, 1) 
+        # 2. Reformat CNN output into a contiguous [B, T, 512] time series for the recurrent head.
+        # contiguous() is free when the backbone ran channels_last, since [B, 512, 1, T] is then
+        # already laid out as [B, T, 512]; otherwise it makes the single copy cuDNN's LSTM needs.
+        x = x.squeeze(2).transpose(1, 2).contiguous()
         
         # 3. Sequence modeling with the bidirectional LSTM and linear projection layers.
         x, _ = self.rnn[0](x) # LSTM
@@ -94,4 +125,18 @@ class CustomCRNN(nn.Module):
         x = self.rnn[2](x)    # ELU
         x = self.rnn[3](x)    # Dropout
         x = self.rnn[4](x)    # Linear
-        return x
\ No newline at end of file
+        return x
+
+def load_crnn_state_dict(path, map_location="cpu"):
+    """
+    Load a CRNN checkpoint and strip the DataParallel 'module.' prefix from its keys.
+    The file is memory-mapped and read as plain tensors (no arbitrary unpickling), so
+    weights are paged in on demand instead of being copied into a fresh buffer first.
+    """
+
+    checkpoint = torch.load(path, map_location=map_location, mmap=True, weights_only=True)
+    if isinstance(checkpoint, dict) and 'state_dict' in checkpoint:
+        state_dict = checkpoint['state_dict']
+    else:
+        state_dict = checkpoint
+    return {k.replace("module.", ""): v for k, v in state_dict.items()}
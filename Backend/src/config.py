@@ -30,6 +30,13 @@ YOLO_PATH = os.path.join(MODELS_DIR, "Yolo_v2.pt")
 # Recognition model that converts cropped word images into character sequences.
 CRNN_PATH = os.path.join(MODELS_DIR, "CRNN_v6.pth")
 
+# Optional ONNX exports of the CRNN (see export_onnx.py); used through ONNX Runtime when present.
+# The FP32 graph is preferred on GPU, the INT8 one on CPU (its quantized ops run on CPU only).
+CRNN_ONNX_FP32_PATH = os.path.join(MODELS_DIR, "CRNN_v6.onnx")
+CRNN_ONNX_PATH = os.path.join(MODELS_DIR, "CRNN_v6.int8.onnx")
+# Serialized TensorRT engines built from the FP32 ONNX graph (only with onnxruntime-gpu + TensorRT).
+CRNN_TRT_CACHE_DIR = os.path.join(CACHE_DIR, "tensorrt")
+
 # Character list / vocabulary used to map model outputs back into text.
 # This file must match the vocabulary used during CRNN training.
 VOCAB_PATH = os.path.join(RESOURCES_DIR, "malayalam_vocab.txt") 
@@ -57,14 +64,52 @@ TRANSLATOR_MODEL_PATH = os.path.join(MODELS_DIR, "translator_1.3B")
 # Choose CUDA when available because OCR inference is much faster on GPU.
 DEVICE = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
 
+# CRNN crops always have the same shape, so let cuDNN benchmark and cache the fastest kernels.
+torch.backends.cudnn.benchmark = True
+
+# Run CRNN inference in reduced precision on GPU (BF16 where supported, else FP16).
+# CPU inference stays in FP32 because only AVX-512/AMX CPUs gain from BF16.
+USE_AMP = DEVICE.type == 'cuda'
+AMP_DTYPE = torch.bfloat16 if USE_AMP and torch.cuda.is_bf16_supported() else torch.float16
+
+# Compile the CRNN with torch.compile (kernel fusion + CUDA graphs). On by default on GPU only,
+# because compilation adds startup time and CPU inductor builds need a C++ toolchain.
+COMPILE_CRNN = os.getenv("COMPILE_CRNN", str(DEVICE.type == 'cuda')).lower() == "true"
+
+# On CPU, quantize the BiLSTM and the output Linear to INT8 (dynamic quantization, FBGEMM).
+# The convolutions stay FP32, where oneDNN is faster than INT8 conv on x86. Opt-in: INT8
+# changes recognition numerics, so enable it only after checking accuracy on held-out crops.
+QUANTIZE_CRNN = os.getenv("QUANTIZE_CRNN", "False").lower() == "true"
+
+# YOLO was trained at 640px; run detection at that size, in FP16 on GPU.
+YOLO_IMGSZ = 640
+YOLO_HALF = DEVICE.type == 'cuda'
+
 # Minimum connected-component area treated as a real character rather than noise.
 ANCHOR_MIN_AREA = 30   # Minimum pixel size to be considered a "Letter" (vs Noise)
 
 # Fixed height used when resizing character crops for the CRNN.
 IMG_H = 32             # Fixed height for CRNN input
+IMG_W = 128            # Fixed width crops are padded/resized to
 # Batch size for OCR recognition inference.
 BATCH_SIZE = 16        # Number of crops to process in parallel (Higher = Faster on GPU)
 
+# Threads that binarize and crop the pages of a batch in parallel (0 = one per CPU core).
+CROP_THREADS = int(os.getenv("CROP_THREADS", "0"))
+
+# Processes used for batched KenLM beam search (1 = decode sequentially, 0 = one per CPU core).
+# Each gunicorn worker forks its own pool, so keep WEB_CONCURRENCY x DECODER_WORKERS within
+# the core count, e.g. DECODER_WORKERS = cpu_count // WEB_CONCURRENCY.
+DECODER_WORKERS = int(os.getenv("DECODER_WORKERS", "1"))
+
+# Concurrent translation requests when several pages are post-processed together.
+TRANSLATE_THREADS = int(os.getenv("TRANSLATE_THREADS", "8"))
+# Number of recent translations kept in memory so repeated texts skip the network.
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "4096"))
+
+# Recognized text shorter than this is treated as noise and skips correction/translation.
+MIN_TEXT_LENGTH = 2
+
 # ==========================================
 # 4. DEBUG CONFIGURATION
 # ==========================================
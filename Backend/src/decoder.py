@@ -3,32 +3,65 @@
 from pyctcdecode import build_ctcdecoder
 import numpy as np
 import os
+import pickle
+import multiprocessing
 from src.logger import Log
 
+def load_unigrams(lexicon_path, cache_dir=None):
+    """
+    Read the lexicon into a list of words, reusing a pickled copy in cache_dir
+    as long as it is newer than the lexicon file.
+    """
+
+    cache_path = os.path.join(cache_dir, "unigrams.pkl") if cache_dir else None
+    if cache_path and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(lexicon_path):
+        try:
+            with open(cache_path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            Log.warn("Unigram cache corrupted. Rebuilding...")
+
+    with open(lexicon_path, "r", encoding="utf-8") as f:
+        # Read lines and strip whitespace
+        unigrams_list = [word for word in (line.strip() for line in f.read().splitlines()) if word]
+
+    if cache_path:
+        try:
+            with open(cache_path, "wb") as f:
+                pickle.dump(unigrams_list, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            Log.warn(f"Could not write unigram cache: {e}")
+    return unigrams_list
+
 class IntelligentDecoder:
-    def __init__(self, char_list, lm_path, lexicon_path):
+    def __init__(self, char_list, lm_path, lexicon_path, cache_dir=None, num_workers=1):
         """
         Args:
             char_list (list): List of characters matching the model output.
             lm_path (str): Path to 'lm.binary'
             lexicon_path (str): Path to 'clean_lexicon.txt'
+            cache_dir (str): Optional folder for the pickled unigram list
+            num_workers (int): Processes for batched beam search (1 decodes in-process, 0 uses every CPU)
         """
         # Load a unigram list so the decoder can bias toward known Malayalam words.
+        # The list only feeds the KenLM decoder, so it is not read when the LM is missing.
         unigrams_list = []
-        if os.path.exists(lexicon_path):
+        if not os.path.exists(lexicon_path):
+            Log.warn(f"Lexicon not found at {lexicon_path}")
+        elif os.path.exists(lm_path):
             Log.process(f"Reading Lexicon from {os.path.basename(lexicon_path)}...")
             try:
-                with open(lexicon_path, "r", encoding="utf-8") as f:
-                    # Read lines and strip whitespace
-                    unigrams_list = [line.strip() for line in f if line.strip()]
+                unigrams_list = load_unigrams(lexicon_path, cache_dir)
                 Log.info(f"Loaded {len(unigrams_list)} words into dictionary.")
             except Exception as e:
                 Log.error(f"Failed to read lexicon file: {e}")
-        else:
-            Log.warn(f"Lexicon not found at {lexicon_path}")
+
+        self.pool = None
 
         # Keep the character labels in the same order as the model output layer.
         self.labels = char_list
+        # Object-array copy so a whole row of indices can be mapped to characters in one fancy-index.
+        self.labels_arr = np.array(char_list, dtype=object)
         
         # Build the decoder only when both the language model and lexicon are available.
         if os.path.exists(lm_path) and unigrams_list:
@@ -43,6 +76,7 @@ class IntelligentDecoder:
                 )
                 self.use_lm = True
                 Log.success("Smart Decoder Loaded")
+                self.pool = self._start_pool(num_workers)
             except Exception as e:
                 Log.error(f"Failed to load KenLM ({e}). Using Greedy Search.")
                 self.use_lm = False
@@ -54,16 +88,46 @@ class IntelligentDecoder:
         """Decode a single CRNN output tensor into text."""
 
         if self.use_lm:
-            text = self.decoder.decode(logits)
-        else:
-            # If LM-based decoding is unavailable, fall back to a simple argmax pass.
-            try:
-                text = self.decoder.decode(logits) 
-            except:
-                # Worst-case fallback when the decoder object is unusable.
-                indexes = np.argmax(logits, axis=-1)
-                text = "".join([self.labels[i] for i in indexes if i != 0]) # Very rough approx
-        return text
+            return self.decoder.decode(logits)
+        # Without the language model, fall back to a best-path (argmax) decode.
+        return self.decode_greedy(logits[None])[0]
+
+    def _start_pool(self, num_workers):
+        """Fork worker processes that share the already-built KenLM decoder for batched beam search."""
+
+        num_workers = num_workers or os.cpu_count() or 1
+        if num_workers < 2:
+            return None
+        try:
+            # fork, so the children inherit the loaded LM instead of rebuilding it.
+            return multiprocessing.get_context("fork").Pool(num_workers)
+        except Exception as e:
+            Log.warn(f"Could not start decoder pool ({e}). Decoding sequentially.")
+            return None
+
+    def decode_batch(self, logits_batch):
+        """Decode a (Batch, SequenceLength, NumClasses) array into a list of strings."""
+
+        if not self.use_lm:
+            return self.decode_greedy(logits_batch)
+        # Beam search is CPU-bound and independent per crop, so spread it across the pool.
+        if self.pool is not None and len(logits_batch) > 1:
+            return self.decoder.decode_batch(self.pool, list(logits_batch))
+        return [self.decoder.decode(logits) for logits in logits_batch]
+
+    def decode_greedy(self, logits_batch):
+        """Best-path CTC decode for a whole batch: argmax per step, merge repeats, drop blanks."""
+
+        return self.decode_best_path(np.argmax(logits_batch, axis=-1))
+
+    def decode_best_path(self, best):
+        """Collapse a (Batch, SequenceLength) array of argmax indices into strings."""
+
+        # A step is kept when it differs from the previous step and is not the blank (index 0).
+        keep = np.ones(best.shape, dtype=bool)
+        keep[:, 1:] = best[:, 1:] != best[:, :-1]
+        keep &= best != 0
+        return ["".join(self.labels_arr[row[mask]]) for row, mask in zip(best, keep)]
 
 def load_vocab(vocab_path):
     """Load a character vocabulary file and prepend the CTC blank token."""
@@ -1,5 +1,8 @@
 """Shared console logger used across the backend modules."""
 
+import os
+import traceback
+
 
 class Log:
     """Tiny ANSI console logger with a consistent label and color scheme."""
@@ -12,6 +15,9 @@ class Log:
     BLUE = "\033[94m"
     CYAN = "\033[96m"
 
+    # Full tracebacks are only formatted in debug mode; production logs get the one-line error.
+    SHOW_TRACEBACKS = os.getenv("DEBUG_MODE", "False").lower() == "true"
+
     @staticmethod
     def process(msg):
         print(f"{Log.CYAN}{Log.BOLD}[PROCESS]{Log.RESET} {msg}")
@@ -30,4 +36,12 @@ class Log:
 
     @staticmethod
     def error(msg):
-        print(f"{Log.RED}{Log.BOLD}[ERROR]{Log.RESET}   {msg}")
\ No newline at end of file
+        print(f"{Log.RED}{Log.BOLD}[ERROR]{Log.RESET}   {msg}")
+
+    @staticmethod
+    def exception(msg):
+        """Log an error from inside an except block, with the traceback in debug mode."""
+
+        Log.error(msg)
+        if Log.SHOW_TRACEBACKS:
+            print(traceback.format_exc(), end="")
@@ -2,18 +2,29 @@ import cv2
 import numpy as np
 import torch
 import os
-import shutil
 import json
-from PIL import Image, ImageOps
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from ultralytics import YOLO
 
+# ONNX Runtime is optional; without it the PyTorch CRNN is always used.
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
 # Imports
 from src.config import *
-from src.architecture import CustomCRNN
+from src.architecture import CustomCRNN, load_crnn_state_dict
 from src.logger import Log
 from src.postprocessor import PostProcessor
 from src.decoder import IntelligentDecoder 
-from src.preprocessor import manual_crop, preprocess_crop_for_ocr
+from src.preprocessor import four_point_transform, binarize_for_ocr, preprocess_crop_for_ocr
+
+# ONNX Runtime providers that keep the CRNN on the GPU.
+GPU_ORT_PROVIDERS = {"CUDAExecutionProvider", "TensorrtExecutionProvider"}
 
 class MalayalamOCR:
     def __init__(self):
@@ -26,24 +37,61 @@ class MalayalamOCR:
         
         # 2. Load CRNN Model
         Log.process(f"Loading CRNN Model from: {os.path.basename(CRNN_PATH)}")
-        self.crnn = CustomCRNN(num_classes).to(DEVICE)
+        self.crnn = CustomCRNN(num_classes)
         
         if os.path.exists(CRNN_PATH):
             try:
-                checkpoint = torch.load(CRNN_PATH, map_location=DEVICE)
-                if isinstance(checkpoint, dict) and 'state_dict' in checkpoint:
-                     state_dict = checkpoint['state_dict']
-                else:
-                     state_dict = checkpoint
-                new_state_dict = {k.replace("module.", ""): v for k, v in state_dict.items()}
-                self.crnn.load_state_dict(new_state_dict)
+                # Adopt the memory-mapped checkpoint tensors as parameters instead of copying them
+                # into freshly initialized ones; the device move below does the only real copy.
+                new_state_dict = load_crnn_state_dict(CRNN_PATH)
+                self.crnn.load_state_dict(new_state_dict, assign=True)
                 self.crnn.eval()
+                # Parameters never need gradients here, so no op can start recording autograd history.
+                self.crnn.requires_grad_(False)
+                # Inference only: fold BatchNorm into the convolutions to save a kernel per layer.
+                self.crnn.fuse_conv_bn()
                 Log.success("CRNN Weights Loaded")
             except Exception as e:
                 Log.error(f"Failed to load weights: {e}")
         else:
             Log.error(f"Model file missing at {CRNN_PATH}")
 
+        # Threads for per-page crop preprocessing in run_batch.
+        self.crop_pool = ThreadPoolExecutor(max_workers=CROP_THREADS or os.cpu_count(), thread_name_prefix="ocr-crops")
+
+        # Pinned host staging buffer and copy stream for crop uploads, one per worker thread.
+        # server.py builds the engine on its OCR thread, so the warm-up allocates that thread's.
+        self.cuda_staging = threading.local()
+
+        # Prefer an ONNX export when one has been generated. The INT8 graph is only considered
+        # when QUANTIZE_CRNN opts in to INT8 numerics, and is tried first on CPU.
+        onnx_paths = [CRNN_ONNX_FP32_PATH]
+        if QUANTIZE_CRNN:
+            onnx_paths.insert(0 if DEVICE.type == 'cpu' else 1, CRNN_ONNX_PATH)
+        self.onnx_session = next(filter(None, (self.load_onnx_session(p) for p in onnx_paths)), None)
+
+        # Tensor-core conv kernels are fastest in NHWC, so run the backbone channels_last on GPU.
+        # With an ONNX session the PyTorch CRNN is never run, so it stays on the CPU.
+        self.memory_format = torch.channels_last if DEVICE.type == 'cuda' else torch.contiguous_format
+        if self.onnx_session is None:
+            self.crnn = self.crnn.to(DEVICE, memory_format=self.memory_format)
+
+        # The PyTorch CRNN on GPU is stored in reduced precision once, instead of autocast
+        # re-casting the FP32 weights on every forward.
+        self.input_dtype = torch.float32
+        if USE_AMP and self.onnx_session is None:
+            self.crnn = self.crnn.to(dtype=AMP_DTYPE)
+            self.input_dtype = AMP_DTYPE
+
+        # Otherwise quantize the recurrent layers on CPU, or compile the PyTorch model into
+        # fused kernels replayed through CUDA graphs.
+        self.crnn_quantized = False
+        if QUANTIZE_CRNN and DEVICE.type == 'cpu' and self.onnx_session is None:
+            self.quantize_crnn()
+        self.crnn_compiled = False
+        if COMPILE_CRNN and self.onnx_session is None and not self.crnn_quantized:
+            self.compile_crnn()
+
         # 3. Initialize Decoder
         Log.process("Initializing Intelligent Decoder...")
         decoder_vocab = list(self.itos)
@@ -51,93 +99,240 @@ class MalayalamOCR:
         self.decoder = IntelligentDecoder(
             char_list=decoder_vocab,
             lm_path=LM_PATH,
-            lexicon_path=LEXICON_PATH
+            lexicon_path=LEXICON_PATH,
+            cache_dir=CACHE_DIR,
+            num_workers=DECODER_WORKERS
         )
 
         # 4. Load YOLO
         Log.process("Loading YOLO & Post-Processor...")
         self.yolo = YOLO(YOLO_PATH)
         self.post_processor = PostProcessor()
+
+        # Counters for how often blank/noise pages skip the post-processing stage.
+        self.pages_processed = 0
+        self.pages_short_circuited = 0
+        self.warmup()
         Log.success("OCR Engine Ready!")
         print("="*50 + "\n")
 
+    def warmup(self):
+        """
+        Push a blank page through the pipeline so CUDA init and kernel selection
+        happen while loading instead of on the first real request.
+        """
+
+        try:
+            start = time.perf_counter()
+            self.run_from_array(np.zeros((640, 640, 3), np.uint8))
+            # A blank page has no word boxes, so exercise the CRNN and decoder on a full batch of blank crops.
+            self.recognize([np.full((IMG_H, IMG_W), 255, np.uint8)] * BATCH_SIZE)
+            Log.info(f"Warm-up pass finished in {time.perf_counter() - start:.2f}s")
+        except Exception as e:
+            Log.warn(f"Warm-up pass failed: {e}")
+
     def build_vocab(self, label_file):
         if not os.path.exists(label_file): return ['<BLANK>'], {}
-        unique_chars = set()
+
+        # Scanning the whole label file takes a while, so reuse the last result while it is still current.
+        cache_path = os.path.join(CACHE_DIR, "vocab.pkl")
+        if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(label_file):
+            try:
+                with open(cache_path, "rb") as f:
+                    return pickle.load(f)
+            except Exception:
+                Log.warn("Vocab cache corrupted. Rebuilding...")
+
         with open(label_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                parts = line.strip().split('\t') if '\t' in line else line.strip().split(' ', 1)
-                if len(parts) >= 2: unique_chars.update(list(parts[1]))
+            lines = f.read().split('\n')
+        # Pick out the label column, then let set() scan all labels as one string in C.
+        labels = []
+        for line in lines:
+            parts = line.strip().split('\t') if '\t' in line else line.strip().split(' ', 1)
+            if len(parts) >= 2: labels.append(parts[1])
+        unique_chars = set("".join(labels))
         chars = sorted(list(unique_chars))
         itos = ['<BLANK>'] + chars
         stoi = {c: i for i, c in enumerate(itos)}
+
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(cache_path, "wb") as f:
+                pickle.dump((itos, stoi), f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            Log.warn(f"Could not write vocab cache: {e}")
         return itos, stoi
 
     def sort_boxes(self, boxes):
-        if not boxes: return []
-        boxes = sorted(boxes, key=lambda b: b[1])
-        lines = []
-        while boxes:
-            box = boxes.pop(0)
-            box_y = (box[1] + box[3]) / 2
-            found = False
-            for line in lines:
-                line_y = sum([(b[1] + b[3]) / 2 for b in line]) / len(line)
-                line_h = sum([b[3] - b[1] for b in line]) / len(line)
-                if abs(box_y - line_y) < (line_h * 0.5):
-                    line.append(box)
-                    found = True
+        """Order word boxes into reading order: lines top to bottom, words left to right."""
+
+        if len(boxes) == 0: return []
+        boxes = np.asarray(boxes)
+        centers = (boxes[:, 1] + boxes[:, 3]) / 2
+        heights = boxes[:, 3] - boxes[:, 1]
+
+        # Walk the boxes top to bottom; each joins the first line whose running mean center is
+        # within half that line's mean height, so slanted lines stay apart.
+        lines, line_y, line_h = [], [], []
+        for i in np.argsort(boxes[:, 1], kind="stable"):
+            for k, members in enumerate(lines):
+                n = len(members)
+                if abs(centers[i] - line_y[k] / n) < 0.5 * line_h[k] / n:
+                    members.append(i)
+                    line_y[k] += centers[i]
+                    line_h[k] += heights[i]
                     break
-            if not found: lines.append([box])
-        sorted_boxes = []
-        for line in lines:
-            line.sort(key=lambda b: b[0])
-            sorted_boxes.extend(line)
-        return sorted_boxes
+            else:
+                lines.append([i])
+                line_y.append(centers[i])
+                line_h.append(heights[i])
+
+        # Lines in the order they were started, words left to right within each line.
+        reading_order = [i for members in lines for i in sorted(members, key=lambda j: boxes[j, 0])]
+        return list(boxes[reading_order])
+
+    def load_onnx_session(self, onnx_path):
+        """Open an ONNX Runtime session for the exported CRNN, or return None to stay on PyTorch."""
+
+        if ort is None or not os.path.exists(onnx_path):
+            return None
+        try:
+            available = ort.get_available_providers()
+            # On a GPU host a CPU-only onnxruntime would pull the CRNN off the GPU, so stay on PyTorch.
+            if DEVICE.type == 'cuda' and not GPU_ORT_PROVIDERS & set(available):
+                Log.info("ONNX Runtime has no GPU provider; using the PyTorch CRNN on the GPU")
+                return None
+            providers = [p for p in ("CUDAExecutionProvider", "CPUExecutionProvider") if p in available]
+            # On GPU let TensorRT take the FP32 graph as an FP16 engine; the INT8 graph's
+            # dynamically quantized ops stay on the CUDA/CPU providers.
+            if onnx_path == CRNN_ONNX_FP32_PATH and "TensorrtExecutionProvider" in available:
+                providers.insert(0, ("TensorrtExecutionProvider", self.tensorrt_options()))
+            # Let ORT fuse Conv+Add+Relu and the other graph-level patterns it knows.
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            session = ort.InferenceSession(onnx_path, sess_options=options, providers=providers)
+            # A GPU provider that fails to initialize is silently dropped, so check what was actually used.
+            if DEVICE.type == 'cuda' and not GPU_ORT_PROVIDERS & set(session.get_providers()):
+                Log.warn(f"ONNX CRNN ({os.path.basename(onnx_path)}) would run on the CPU; using PyTorch")
+                return None
+            Log.success(f"CRNN ONNX Runtime session loaded ({os.path.basename(onnx_path)})")
+            return session
+        except Exception as e:
+            Log.warn(f"Could not load ONNX CRNN, using PyTorch: {e}")
+            return None
+
+    def quantize_crnn(self):
+        """Swap the CRNN's LSTM and Linear layers for dynamically quantized INT8 versions (CPU only)."""
+
+        try:
+            self.crnn = torch.ao.quantization.quantize_dynamic(
+                self.crnn, {torch.nn.LSTM, torch.nn.Linear}, dtype=torch.qint8
+            )
+            self.crnn_quantized = True
+            Log.success("CRNN LSTM/Linear quantized to INT8")
+        except Exception as e:
+            Log.warn(f"INT8 quantization failed, keeping FP32 CRNN: {e}")
+
+    def tensorrt_options(self):
+        """TensorRT provider options: FP16, one profile over the fixed crop shape, engine cached on disk."""
+
+        # Building the engine takes minutes, so keep it next to the other caches for later starts.
+        os.makedirs(CRNN_TRT_CACHE_DIR, exist_ok=True)
+        shape = f"image:{{}}x1x{IMG_H}x{IMG_W}"
+        return {
+            "trt_fp16_enable": True,
+            "trt_engine_cache_enable": True,
+            "trt_engine_cache_path": CRNN_TRT_CACHE_DIR,
+            "trt_profile_min_shapes": shape.format(1),
+            "trt_profile_opt_shapes": shape.format(BATCH_SIZE),
+            "trt_profile_max_shapes": shape.format(BATCH_SIZE),
+        }
+
+    def compile_crnn(self):
+        """Compile the CRNN with torch.compile and capture its graph on dummy batches."""
+
+        Log.process("Compiling CRNN (torch.compile, reduce-overhead)...")
+        eager_crnn = self.crnn
+        try:
+            self.crnn = torch.compile(eager_crnn, mode="reduce-overhead", dynamic=False)
+            dummy = torch.zeros(BATCH_SIZE, 1, IMG_H, IMG_W, device=DEVICE, dtype=self.input_dtype)
+            dummy = dummy.contiguous(memory_format=self.memory_format)
+            # Two passes: the first compiles, the second records the CUDA graph.
+            with torch.inference_mode():
+                for _ in range(2):
+                    self.crnn(dummy)
+            self.crnn_compiled = True
+            Log.success("CRNN compiled")
+        except Exception as e:
+            self.crnn = eager_crnn
+            Log.warn(f"torch.compile failed, using eager CRNN: {e}")
+
+    def forward_chunk(self, chunk):
+        """Run one mini-batch through the CRNN, padding it to BATCH_SIZE when compiled."""
+
+        n = len(chunk)
+        if not self.crnn_compiled:
+            return self.crnn(chunk)
+        # The compiled graph is specialized to a full batch, so pad the last chunk instead of recompiling.
+        if n < BATCH_SIZE:
+            chunk = torch.cat([chunk, chunk.new_zeros((BATCH_SIZE - n, *chunk.shape[1:]))])
+        # CUDA graph outputs are reused by the next replay, so keep a copy.
+        return self.crnn(chunk)[:n].clone()
 
     def predict_batch(self, crop_batch):
         """
         Runs batch inference on a tensor of crops.
         crop_batch: (Batch, 1, H, W) float tensor
+        Mini-batches of BATCH_SIZE are queued back to back and the logits are
+        copied to the host once, instead of syncing after every mini-batch.
         Returns: list of text strings
         """
-        with torch.no_grad():
-            preds = self.crnn(crop_batch)
-            # preds shape: (Batch, SequenceLength, NumClasses)
-            preds_np = preds.cpu().detach().numpy()
+        with torch.inference_mode():
+            chunks = [crop_batch[i : i + BATCH_SIZE] for i in range(0, len(crop_batch), BATCH_SIZE)]
+            if self.onnx_session is not None:
+                input_name = self.onnx_session.get_inputs()[0].name
+                preds_np = np.concatenate([
+                    self.onnx_session.run(None, {input_name: chunk.numpy()})[0] for chunk in chunks
+                ])
+            else:
+                preds = torch.cat([self.forward_chunk(chunk) for chunk in chunks])
+                # preds shape: (Batch, SequenceLength, NumClasses)
+                if not self.decoder.use_lm:
+                    # Greedy decoding only needs the argmax, so take it on the device and copy
+                    # back one index per step instead of the whole logits tensor.
+                    return self.decoder.decode_best_path(preds.argmax(dim=-1).cpu().numpy())
+                # Beam search needs the full logits; decode in FP32
+                preds_np = preds.float().cpu().numpy()
             
-            results = []
-            for logits in preds_np:
-                # Decode each item in the batch
-                text = self.decoder.decode(logits)
-                results.append(text)
-            return results
-
-    def smart_manual_crop(self, image, points_json, scale_factor=1.0):
+            return self.decoder.decode_batch(preds_np)
+
+    def smart_manual_crop(self, image, points, scale_factor=1.0):
+        """Crop to the four corner points, given as a (4, 2) array or its JSON string."""
+
         try:
-            pts = np.array(json.loads(points_json), dtype="float32")
+            if isinstance(points, str):
+                points = json.loads(points)
+            pts = np.array(points, dtype="float32")
             h, w = image.shape[:2]
             if np.max(pts) <= 1.0:
                 pts[:, 0] *= w
                 pts[:, 1] *= h
             else:
                 pts *= scale_factor
-            return manual_crop(image, json.dumps(pts.tolist()))
+            return four_point_transform(image, pts)
         except:
             return image
 
     def run(self, image_path, crop_points=None, debug=False):
         Log.info(f"Processing Image: {os.path.basename(image_path)}")
         
-        # 1. Load Image
-        try:
-            pil_image = Image.open(image_path)
-            pil_image = ImageOps.exif_transpose(pil_image) 
-            original = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
-        except:
-            original = cv2.imread(image_path)
-        
+        # 1. Load Image (single decode; OpenCV applies the EXIF orientation itself)
+        original = cv2.imread(image_path, cv2.IMREAD_COLOR)
         if original is None: return "Error loading image", "", ""
+        return self.run_from_array(original, crop_points=crop_points, debug=debug)
+
+    def prepare_input(self, original, crop_points=None):
+        """Upscale small images and apply the optional manual crop before detection."""
 
         # 2. Scale Guard (Keep original high res for YOLO)
         h, w = original.shape[:2]
@@ -149,71 +344,179 @@ class MalayalamOCR:
             original = cv2.resize(original, None, fx=scale_factor, fy=scale_factor, interpolation=cv2.INTER_CUBIC)
 
         # 3. Crop
-        if crop_points:
-            detection_input = self.smart_manual_crop(original, crop_points, scale_factor)
-        else:
-            detection_input = original
+        if crop_points is not None and len(crop_points):
+            return self.smart_manual_crop(original, crop_points, scale_factor)
+        return original
 
-        # Setup Debug
-        debug_dir = "debug_output"
-        if debug:
-            if os.path.exists(debug_dir): shutil.rmtree(debug_dir)
-            os.makedirs(debug_dir)
-            cv2.imwrite(os.path.join(debug_dir, "0_input.jpg"), detection_input)
-
-        # 4. Detect (YOLO)
-        # Feed the RAW, COLOR image to YOLO (Best for detection)
-        results = self.yolo.predict(detection_input, conf=0.5, verbose=False)
-        boxes = []
-        for r in results:
-            for box in r.boxes.xyxy.cpu().numpy():
-                boxes.append(box.astype(int))
-        
-        if not boxes: return "No text detected.", "", ""
-        
-        # 5. Recognize (CRNN) - Optimized Batch Processing
-        boxes = self.sort_boxes(boxes) 
-        Log.info(f"Detected {len(boxes)} words. Running batched inference...")
+    def extract_crops(self, detection_input, boxes, debug_dir=None, prefix=""):
+        """Cut the sorted word boxes out of the page and preprocess them for the CRNN."""
 
         crop_tensors = []
-        
+        if len(boxes) == 0:
+            return crop_tensors
+
+        # Convert and binarize the page once; the crops are then 2-D views of the binary plane.
+        gray_page = cv2.cvtColor(detection_input, cv2.COLOR_BGR2GRAY) if detection_input.ndim == 3 else detection_input
+        binary_page = binarize_for_ocr(gray_page)
+        h_img, w_img = binary_page.shape
+
         for i, (x1, y1, x2, y2) in enumerate(boxes):
             pad = 5
-            h_img, w_img = detection_input.shape[:2]
             y1_safe, y2_safe = max(0, y1-pad), min(h_img, y2+pad)
             x1_safe, x2_safe = max(0, x1-pad), min(w_img, x2+pad)
             
-            # Crop RAW image
-            crop_raw = detection_input[y1_safe:y2_safe, x1_safe:x2_safe]
+            # Crop the binarized page
+            crop_raw = binary_page[y1_safe:y2_safe, x1_safe:x2_safe]
             
-            # Use the NEW Training-Matched Preprocessor
-            processed_crop = preprocess_crop_for_ocr(crop_raw, target_h=IMG_H, target_w=128)
-            
-            # Invert colors (Background 1.0 -> 0.0)
-            img_arr = 1.0 - processed_crop
-            crop_tensors.append(img_arr)
+            # Use the NEW Training-Matched Preprocessor (kept as uint8; inversion and scaling happen on the device)
+            processed_crop = preprocess_crop_for_ocr(crop_raw, target_h=IMG_H, target_w=IMG_W, normalize=False, binarized=True)
+            crop_tensors.append(processed_crop)
             
+            if debug_dir:
+                cv2.imwrite(os.path.join(debug_dir, f"{prefix}crop_{i}.png"), processed_crop)
+
+        return crop_tensors
+
+    @torch.inference_mode()
+    def recognize(self, crop_tensors):
+        """Run the CRNN over every preprocessed crop and decode the results."""
+
+        if not crop_tensors:
+            return []
+
+        # Stack the uint8 crops into one (N, H, W) buffer, copy it to the device in a single
+        # transfer (a quarter of the bytes of float32), then invert (background 255 -> 0) and
+        # scale to 0-1 there in one pass: (x - 255) / -255. ONNX Runtime takes host arrays and
+        # does its own upload, so for a session the batch is built on the host as on CPU.
+        if DEVICE.type != 'cuda' or self.onnx_session is not None:
+            batch_tensor = torch.from_numpy(np.stack(crop_tensors)).unsqueeze(1).float().sub_(255.0).div_(-255.0)
+            return self.predict_batch(batch_tensor)
+
+        # On GPU stack straight into page-locked memory so the copy is a true async DMA,
+        # and issue copy and forward on this thread's own stream.
+        pinned, device_u8, batch_tensor, stream = self.staging_buffers(len(crop_tensors), crop_tensors[0].shape)
+        np.stack(crop_tensors, out=pinned.numpy())
+        with torch.cuda.stream(stream):
+            # Copy into the thread's persistent device buffers, then invert and scale in place.
+            device_u8.copy_(pinned, non_blocking=True)
+            batch_tensor.copy_(device_u8.unsqueeze(1))
+            batch_tensor.sub_(255.0).div_(-255.0)
+            # predict_batch ends with a device-to-host copy, so the staging buffers are free again on return.
+            return self.predict_batch(batch_tensor)
+
+    def staging_buffers(self, n, crop_shape):
+        """
+        Return views of the calling thread's reusable crop buffers for a batch of n crops:
+        pinned host (n, H, W) uint8, device (n, H, W) uint8, device (n, 1, H, W) model input,
+        plus the thread's CUDA stream. Reusing them keeps allocator traffic off the hot path.
+        """
+
+        staging = self.cuda_staging
+        buffer = getattr(staging, "buffer", None)
+        if buffer is None or buffer.shape[0] < n or tuple(buffer.shape[1:]) != tuple(crop_shape):
+            # Grow in whole mini-batches so a slightly larger page does not reallocate every time.
+            capacity = -(-n // BATCH_SIZE) * BATCH_SIZE
+            staging.buffer = torch.empty((capacity, *crop_shape), dtype=torch.uint8, pin_memory=True)
+            staging.device_u8 = torch.empty((capacity, *crop_shape), dtype=torch.uint8, device=DEVICE)
+            staging.device_input = torch.empty(
+                (capacity, 1, *crop_shape), dtype=self.input_dtype, device=DEVICE
+            ).contiguous(memory_format=self.memory_format)
+            staging.stream = getattr(staging, "stream", None) or torch.cuda.Stream()
+        return staging.buffer[:n], staging.device_u8[:n], staging.device_input[:n], staging.stream
+
+    def run_from_array(self, original, crop_points=None, debug=False):
+        """Run the OCR pipeline on an already decoded BGR image."""
+
+        return self.run_batch([original], [crop_points], debug=debug)[0]
+
+    def run_batch(self, images, crop_points_list=None, debug=False):
+        """
+        Run the OCR pipeline on several decoded BGR images at once.
+        YOLO sees all pages in one call and the CRNN recognizes the crops of every
+        page together, so concurrent requests share the same forward passes.
+        Returns one (raw, corrected, translated) tuple per input image.
+        """
+
+        if crop_points_list is None:
+            crop_points_list = [None] * len(images)
+        inputs = [self.prepare_input(img, pts) for img, pts in zip(images, crop_points_list)]
+
+        # Setup Debug
+        # One folder per batch, so nothing is wiped and concurrent batches do not clobber each other.
+        debug_dir = os.path.join("debug_output", str(time.time_ns())) if debug else None
+        if debug:
+            os.makedirs(debug_dir, exist_ok=True)
+
+        # 4. Detect (YOLO)
+        # Feed the RAW, COLOR images to YOLO (Best for detection)
+        # Fixed imgsz/half/device keep ultralytics on the predictor it set up during warm-up.
+        results = self.yolo.predict(inputs, conf=0.5, imgsz=YOLO_IMGSZ, half=YOLO_HALF, device=DEVICE, verbose=False)
+
+        # 5. Recognize (CRNN) - Optimized Batch Processing across all images
+        boxes_list, prefixes = [], []
+        for n, (detection_input, r) in enumerate(zip(inputs, results)):
+            prefix = f"{n}_" if len(inputs) > 1 else ""
             if debug:
-                visual_check = (processed_crop * 255).astype(np.uint8)
-                cv2.imwrite(os.path.join(debug_dir, f"crop_{i}.png"), visual_check)
-            
-        # Run Batch Inference
-        full_text_list = []
-        if crop_tensors:
-            # Stack into (N, 1, H, W)
-            batch_np = np.array(crop_tensors, dtype=np.float32)
-            batch_tensor = torch.from_numpy(batch_np).unsqueeze(1).to(DEVICE)
-            
-            # Process in mini-batches to match BATCH_SIZE config
-            total_items = len(crop_tensors)
-            for start_idx in range(0, total_items, BATCH_SIZE):
-                batch_slice = batch_tensor[start_idx : start_idx + BATCH_SIZE]
-                texts = self.predict_batch(batch_slice)
-                full_text_list.extend(texts)
-            
-        smart_sentence = " ".join(full_text_list)
-        
-        # 6. Translate
-        corrected, translated = self.post_processor.process(smart_sentence)
+                cv2.imwrite(os.path.join(debug_dir, f"{prefix}0_input.jpg"), detection_input)
+
+            # One (N, 4) int array per page instead of a Python list of per-box arrays.
+            boxes = r.boxes.xyxy.cpu().numpy().astype(int)
+            boxes_list.append(self.sort_boxes(boxes))
+            prefixes.append(prefix)
+
+        # Binarizing and cropping a page is OpenCV work that releases the GIL, so pages run in parallel.
+        crop_args = (inputs, boxes_list, [debug_dir] * len(inputs), prefixes)
+        if len(inputs) > 1:
+            page_crops = list(self.crop_pool.map(self.extract_crops, *crop_args))
+        else:
+            page_crops = list(map(self.extract_crops, *crop_args))
+
+        all_crops = [crop for crops in page_crops for crop in crops]
+        crop_counts = [len(crops) for crops in page_crops]
+
+        Log.info(f"Detected {len(all_crops)} words in {len(inputs)} image(s). Running batched inference...")
+        texts = self.recognize(all_crops)
+
+        # 6. Translate (skipped for pages with no usable text)
+        outputs = []
+        pending = []
+        offset = 0
+        for count in crop_counts:
+            self.pages_processed += 1
+            if count == 0:
+                self.pages_short_circuited += 1
+                outputs.append(("No text detected.", "", ""))
+                continue
+            smart_sentence = " ".join(texts[offset : offset + count])
+            offset += count
+            if len(smart_sentence.strip()) < MIN_TEXT_LENGTH:
+                self.pages_short_circuited += 1
+                Log.info(f"Skipping correction/translation for near-empty text "
+                         f"({self.pages_short_circuited}/{self.pages_processed} pages short-circuited)")
+                outputs.append((smart_sentence, "", ""))
+                continue
+            pending.append(len(outputs))
+            outputs.append((smart_sentence, "", ""))
+
+        # Post-process every remaining page of the batch together.
+        processed = self.post_processor.process_batch([outputs[i][0] for i in pending])
+        for i, (corrected, translated) in zip(pending, processed):
+            outputs[i] = (outputs[i][0], corrected, translated)
         
-        return smart_sentence, corrected, translated
\ No newline at end of file
+        return outputs
+
+
+# Loading YOLO, the CRNN and the decoder takes seconds and hundreds of MB, so every
+# caller in a process shares one engine.
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """Return the process-wide MalayalamOCR instance, creating it on first use."""
+
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = MalayalamOCR()
+    return _engine
@@ -5,19 +5,28 @@ import torch
 import re
 import unicodedata
 import pickle
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from symspellpy import SymSpell, Verbosity
 from deep_translator import GoogleTranslator
 from src.logger import Log
 
 # Import configuration with a fallback so the module can still be imported in isolation.
 try:
-    from src.config import DICT_PATH, CACHE_DIR, TRANSLATOR_MODEL_PATH
+    from src.config import DICT_PATH, CACHE_DIR, TRANSLATOR_MODEL_PATH, TRANSLATE_THREADS, TRANSLATION_CACHE_SIZE
 except ImportError:
     DICT_PATH = "malayalam_dict.txt" 
     CACHE_DIR = "./cache"
     TRANSLATOR_MODEL_PATH = ""
+    TRANSLATE_THREADS = 8
+    TRANSLATION_CACHE_SIZE = 4096
 
 class PostProcessor:
+    # Patterns are compiled once for the class instead of looked up in re's cache on every call.
+    RE_REPEATED_SIGNS = re.compile(r'([ാ-ൃംഃ])\1+')
+    RE_SENTENCE_END = re.compile(r'(ആണ്|അല്ല|ഉണ്ട്|ഇല്ല)(?=(\s|$))')
+
     def __init__(self):
         """Initialize the dictionary cache and translation pipeline."""
 
@@ -29,18 +38,35 @@ class PostProcessor:
 
         # Choose GPU when available, otherwise keep the translator on CPU.
         self.device = 0 if torch.cuda.is_available() else -1
-        self.translator = None
-        self._init_translator()
+        # The translator is created on the first text that actually needs translating,
+        # so pages that never reach translation do not pay for it. GoogleTranslator keeps
+        # per-request state on the instance, so every thread gets its own.
+        self._local = threading.local()
+        # Translation is a network round trip per text, so batches are translated concurrently.
+        self.translate_pool = ThreadPoolExecutor(max_workers=TRANSLATE_THREADS, thread_name_prefix="translate")
+        # Recently translated texts, most recent last; shared by all threads.
+        self._translation_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def _get_translator(self):
+        """Return this thread's translator, loading it on first use (None if it failed to load)."""
+
+        if not getattr(self._local, "ready", False):
+            self._local.translator = self._init_translator()
+            self._local.ready = True
+        return self._local.translator
 
     def _init_translator(self):
         """Load the lightweight online translation model API (Google Translator)."""
 
         try:
             Log.process("Initializing Google Translator Pipeline...")
-            self.translator = GoogleTranslator(source='ml', target='en')
+            translator = GoogleTranslator(source='ml', target='en')
             Log.success("Translator Loaded (ONLINE - GoogleTranslator)")
+            return translator
         except Exception as e:
             Log.error(f"Translator failed to load: {e}")
+            return None
 
     def _load_dictionary_optimized(self):
         """Cache the dictionary on disk so startup does not rebuild it every time."""
@@ -58,19 +84,37 @@ class PostProcessor:
                 Log.warn("Cache corrupted. Rebuilding...")
 
         if os.path.exists(DICT_PATH):
+            # SymSpell's loader needs "term count" lines; on a word-only list it would scan every
+            # line, skip them all and cache an empty dictionary, so check the format first.
+            if not self._has_count_column(DICT_PATH):
+                Log.warn(f"{os.path.basename(DICT_PATH)} has no frequency column; skipping SymSpell dictionary")
+                return
             Log.process(f"Building Dictionary from {os.path.basename(DICT_PATH)}...")
             self.sym_spell.load_dictionary(DICT_PATH, term_index=0, count_index=1, encoding="utf-8")
-            with open(cache_path, "wb") as f: pickle.dump(self.sym_spell, f)
+            with open(cache_path, "wb") as f: pickle.dump(self.sym_spell, f, protocol=pickle.HIGHEST_PROTOCOL)
             Log.success("Dictionary Built & Cached")
         else:
             Log.error(f"Dictionary path not found! ({DICT_PATH})")
 
+    @staticmethod
+    def _has_count_column(dict_path):
+        """Return True if the first non-empty line of the dictionary looks like 'term count'."""
+
+        with open(dict_path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if parts:
+                    return len(parts) >= 2 and parts[1].isdigit()
+        return False
+
     def normalize_and_clean(self, text):
         """Normalize Unicode and remove common OCR artifacts."""
 
-        text = unicodedata.normalize('NFC', text)
+        # OCR output is usually NFC already; the quick check avoids rebuilding the string.
+        if not unicodedata.is_normalized('NFC', text):
+            text = unicodedata.normalize('NFC', text)
         # Collapse repeated combining marks that often appear in OCR noise.
-        text = re.sub(r'([ാ-ൃംഃ])\1+', r'\1', text)
+        text = self.RE_REPEATED_SIGNS.sub(r'\1', text)
         # Remove invisible joiners that can interfere with dictionary lookup and translation.
         text = text.replace('\u200D', '').replace('\u200C', '')
         return text
@@ -79,14 +123,12 @@ class PostProcessor:
         """Add simple sentence boundaries so the translation model gets a little context."""
 
         # Insert a period after common Malayalam sentence-ending words.
-        text = re.sub(r'(ആണ്|അല്ല|ഉണ്ട്|ഇല്ല)(?=(\s|$))', r'\1. ', text)
+        text = self.RE_SENTENCE_END.sub(r'\1. ', text)
         return text.strip()
 
-    def process(self, raw_text):
-        """Clean OCR text and produce both the corrected Malayalam and English translation."""
+    def prepare(self, raw_text):
+        """Return the corrected Malayalam text and the punctuated version sent to the translator."""
 
-        if not raw_text or not raw_text.strip(): return "", ""
-        
         # Step 1: Normalize the OCR output.
         text = self.normalize_and_clean(raw_text)
         
@@ -94,16 +136,77 @@ class PostProcessor:
         # text = self.merge_split_words(text)
         
         # Step 3: Add punctuation so translation quality improves slightly.
-        text_with_grammar = self.inject_punctuation(text)
+        return text, self.inject_punctuation(text)
+
+    def translate(self, text):
+        """Translate one text through the cache, returning an inline error marker instead of raising."""
+
+        cached = self._cached_translation(text)
+        if cached is not None:
+            return cached
+        translation = self._translate_uncached(text)
+        self._remember_translation(text, translation)
+        return translation
+
+    def _cached_translation(self, text):
+        """Return a previously stored translation of text, or None."""
+
+        with self._cache_lock:
+            translation = self._translation_cache.get(text)
+            if translation is not None:
+                self._translation_cache.move_to_end(text)
+            return translation
+
+    def _remember_translation(self, text, translation):
+        """Store a successful translation, evicting the least recently used one when full."""
+
+        if not translation or translation.startswith("[Error:"):
+            return
+        with self._cache_lock:
+            self._translation_cache[text] = translation
+            self._translation_cache.move_to_end(text)
+            if len(self._translation_cache) > TRANSLATION_CACHE_SIZE:
+                self._translation_cache.popitem(last=False)
+
+    def _translate_uncached(self, text):
+        """Send one text to the translator."""
+
+        translator = self._get_translator()
+        if not translator:
+            return ""
+        try:
+            out = translator.translate(text)
+            return out if out else ""
+        except Exception as e:
+            Log.error(f"Translation Error: {e}")
+            return f"[Error: {str(e)}]"
+
+    def translate_many(self, texts):
+        """Translate several texts, one request per text, running the requests concurrently."""
+
+        # Texts are never packed into a shared request: they can come from different callers,
+        # and a split-back reply is not guaranteed to line up with its inputs.
+        if len(texts) > 1:
+            return list(self.translate_pool.map(self.translate, texts))
+        return [self.translate(text) for text in texts]
+
+    def process(self, raw_text):
+        """Clean OCR text and produce both the corrected Malayalam and English translation."""
+
+        if not raw_text or not raw_text.strip(): return "", ""
         
-        # Step 4: Translate the cleaned text if a translator is available.
-        translation = ""
-        if self.translator:
-            try:
-                out = self.translator.translate(text_with_grammar)
-                translation = out if out else ""
-            except Exception as e:
-                translation = f"[Error: {str(e)}]"
-                Log.error(f"Translation Error: {e}")
+        text, text_with_grammar = self.prepare(raw_text)
         
-        return text, translation
\ No newline at end of file
+        # Step 4: Translate the cleaned text if a translator is available.
+        return text, self.translate(text_with_grammar)
+
+    def process_batch(self, raw_texts):
+        """Run process() over the texts of several OCR pages, translating them concurrently; returns (corrected, translation) pairs."""
+
+        results = [("", "")] * len(raw_texts)
+        indices = [i for i, raw_text in enumerate(raw_texts) if raw_text and raw_text.strip()]
+        prepared = [self.prepare(raw_texts[i]) for i in indices]
+        translations = self.translate_many([text_with_grammar for _, text_with_grammar in prepared])
+        for i, (text, _), translation in zip(indices, prepared, translations):
+            results[i] = (text, translation)
+        return results
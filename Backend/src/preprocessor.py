@@ -1,12 +1,16 @@
 """Image geometry and OCR crop preprocessing helpers."""
 
 import cv2
+import heapq
 import numpy as np
 import json
 
 # ==========================================
 # 1. GEOMETRY HELPERS (Keep for Frontend Crop)
 # ==========================================
+# Normalized centered rectangle used when no document outline can be found.
+DEFAULT_CORNERS = np.array([[0.2, 0.2], [0.8, 0.2], [0.8, 0.8], [0.2, 0.8]], dtype="float32")
+
 def order_points(pts):
     """Return the four points in top-left, top-right, bottom-right, bottom-left order."""
 
@@ -19,16 +23,26 @@ def order_points(pts):
     rect[3] = pts[np.argmax(diff)]
     return rect
 
+def apply_exif_orientation(image, orientation):
+    """Rotate/flip a decoded image according to its EXIF orientation tag (1-8)."""
+
+    if orientation == 2: return cv2.flip(image, 1)
+    if orientation == 3: return cv2.rotate(image, cv2.ROTATE_180)
+    if orientation == 4: return cv2.flip(image, 0)
+    if orientation == 5: return cv2.transpose(image)
+    if orientation == 6: return cv2.rotate(image, cv2.ROTATE_90_CLOCKWISE)
+    if orientation == 7: return cv2.flip(cv2.transpose(image), -1)
+    if orientation == 8: return cv2.rotate(image, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    return image
+
 def four_point_transform(image, pts):
     """Warp the image so the provided quadrilateral becomes a straight rectangle."""
 
     rect = order_points(pts)
-    (tl, tr, br, bl) = rect
-    widthA = np.sqrt(((br[0] - bl[0]) ** 2) + ((br[1] - bl[1]) ** 2))
-    widthB = np.sqrt(((tr[0] - tl[0]) ** 2) + ((tr[1] - tl[1]) ** 2))
+    # Edge lengths bottom, top, right, left (rect is tl, tr, br, bl) in one vectorized call.
+    edges = rect[[2, 1, 1, 0]] - rect[[3, 0, 2, 3]]
+    widthA, widthB, heightA, heightB = np.hypot(edges[:, 0], edges[:, 1])
     maxWidth = max(int(widthA), int(widthB))
-    heightA = np.sqrt(((tr[0] - br[0]) ** 2) + ((tr[1] - br[1]) ** 2))
-    heightB = np.sqrt(((tl[0] - bl[0]) ** 2) + ((tl[1] - bl[1]) ** 2))
     maxHeight = max(int(heightA), int(heightB))
     dst = np.array([
         [0, 0],
@@ -53,7 +67,7 @@ def manual_crop(image, points_json):
         return image
 
 def get_document_corners(image):
-    """Detect the largest four-point contour and return normalized corner coordinates."""
+    """Detect the largest four-point contour and return normalized corners as a (4, 2) float32 array."""
 
     ratio = image.shape[0] / 600.0
     small = cv2.resize(image, (int(image.shape[1] / ratio), 600))
@@ -61,34 +75,26 @@ def get_document_corners(image):
     blurred = cv2.GaussianBlur(gray, (5, 5), 0)
     edges = cv2.Canny(blurred, 75, 200)
     cnts, _ = cv2.findContours(edges, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
-    cnts = sorted(cnts, key=cv2.contourArea, reverse=True)[:5]
+    # Only the five largest contours are tried, so select them without sorting the whole list.
+    cnts = heapq.nlargest(5, cnts, key=cv2.contourArea)
+    h, w = small.shape[:2]
+    scale = np.array([w, h], dtype="float32")
     for c in cnts:
         peri = cv2.arcLength(c, True)
         approx = cv2.approxPolyDP(c, 0.02 * peri, True)
         if len(approx) == 4:
             pts = approx.reshape(4, 2)
-            rect = order_points(pts)
-            h, w = small.shape[:2]
-            return [[float(p[0]/w), float(p[1]/h)] for p in rect]
-    return [[0.2, 0.2], [0.8, 0.2], [0.8, 0.8], [0.2, 0.8]]
+            return order_points(pts) / scale
+    return DEFAULT_CORNERS.copy()
 
 # ==========================================
 # 2. MATCHED TRAINING PREPROCESSING (The Fix)
 # ==========================================
-def preprocess_crop_for_ocr(crop_img, target_h=64, target_w=256):
-    """
-    Prepare a word crop for the CRNN by binarizing first, then resizing and padding.
-    The order matters because the model was trained on cleaned handwritten images.
-    """
-
-    # Convert color input into grayscale before thresholding.
-    if len(crop_img.shape) == 3:
-        gray = cv2.cvtColor(crop_img, cv2.COLOR_BGR2GRAY)
-    else:
-        gray = crop_img.copy()
+def binarize_for_ocr(gray):
+    """Adaptive-threshold a grayscale image (a single crop or a whole page) the way the CRNN was trained."""
 
     # Apply adaptive thresholding at the original resolution so stroke detail is preserved.
-    binary = cv2.adaptiveThreshold(
+    return cv2.adaptiveThreshold(
         gray,
         255,
         cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
@@ -97,6 +103,24 @@ def preprocess_crop_for_ocr(crop_img, target_h=64, target_w=256):
         15    # constant (tuned for pen strokes)
     )
 
+def preprocess_crop_for_ocr(crop_img, target_h=64, target_w=256, normalize=True, binarized=False):
+    """
+    Prepare a word crop for the CRNN by binarizing first, then resizing and padding.
+    The order matters because the model was trained on cleaned handwritten images.
+    With normalize=False the padded uint8 canvas is returned so scaling can happen later in bulk.
+    Pass binarized=True for crops cut from a page already run through binarize_for_ocr.
+    """
+
+    if binarized:
+        binary = crop_img
+    else:
+        # Convert color input into grayscale before thresholding.
+        if len(crop_img.shape) == 3:
+            gray = cv2.cvtColor(crop_img, cv2.COLOR_BGR2GRAY)
+        else:
+            gray = crop_img
+        binary = binarize_for_ocr(gray)
+
     h, w = binary.shape
 
     # Shrink tall crops before padding so extreme aspect ratios stay manageable.
@@ -105,7 +129,7 @@ def preprocess_crop_for_ocr(crop_img, target_h=64, target_w=256):
         new_w = int(w * scale)
         resized = cv2.resize(binary, (new_w, target_h), interpolation=cv2.INTER_AREA)
     else:
-        resized = binary.copy()
+        resized = binary
         new_w = w
 
     # Center the text vertically inside the fixed-height canvas.
@@ -127,6 +151,9 @@ def preprocess_crop_for_ocr(crop_img, target_h=64, target_w=256):
         cv2.BORDER_CONSTANT, value=255
     )
 
+    if not normalize:
+        return final
+
     # Normalize into the 0-1 range expected by the network.
     final = final.astype(np.float32) / 255.0
 
@@ -56,8 +56,8 @@ const ApiDocumentation = () => {
       endpoint: "/detect-corners",
       purpose: "Document Detection",
       description: "Detects document boundaries for auto-crop functionality",
-      params: ["file: UploadFile"],
-      response: ["points: [[x,y], [x,y], [x,y], [x,y]]"]
+      params: ["file: UploadFile", "layout: \"soa\" | \"aos\" (optional query)"],
+      response: ["x: [x0, x1, x2, x3]", "y: [y0, y1, y2, y3]"]
     },
     {
       method: "POST",
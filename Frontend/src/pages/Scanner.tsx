@@ -57,7 +57,10 @@ export default function Scanner() {
         formData.append("file", file);
         fetch(`${BASE_URL}/detect-corners`, { method: "POST", body: formData })
           .then(res => res.json())
-          .then(data => { if(data.points) setInitialCropPoints(data.points); })
+          .then(data => {
+            // Corners arrive as parallel x/y arrays; the editor wants [x, y] pairs.
+            if (data.x && data.y) setInitialCropPoints(data.x.map((x: number, i: number) => [x, data.y[i]]));
+          })
           .catch(e => console.warn("Auto-detect failed", e));
     } catch (e) {}
   };